@@ -9,10 +9,22 @@ mongodb = MongoDB()
 
 async def connect_to_mongo():
     """Connect to MongoDB"""
+    # Reuse the open client if already connected - repeated calls from
+    # scripts and tests then cost nothing instead of a fresh topology
+    # discovery and auth handshake each time
+    if mongodb.client is not None:
+        return True
     try:
         print(f"Connecting to MongoDB: {MONGODB_URL}")
         print(f"Database name: {DATABASE_NAME}")
-        mongodb.client = AsyncIOMotorClient(MONGODB_URL, serverSelectionTimeoutMS=10000)
+        # Pool sizing lets concurrent bulk/gather work reach the wire in
+        # parallel instead of serializing on a tiny connection pool
+        mongodb.client = AsyncIOMotorClient(
+            MONGODB_URL,
+            serverSelectionTimeoutMS=10000,
+            maxPoolSize=50,
+            minPoolSize=10
+        )
         mongodb.db = mongodb.client[DATABASE_NAME]
         # Test the connection
         server_info = await mongodb.client.admin.command('ismaster')
@@ -31,6 +43,9 @@ async def close_mongo_connection():
     """Close MongoDB connection"""
     if mongodb.client:
         mongodb.client.close()
+    # Clear the cached client so a later connect_to_mongo() reconnects
+    mongodb.client = None
+    mongodb.db = None
     print("Closed MongoDB connection")
 
 def get_database() -> AsyncIOMotorDatabase:
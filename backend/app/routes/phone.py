@@ -3,7 +3,7 @@ from fastapi import APIRouter, HTTPException, Depends, status, Request, Header,
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel
 import random
-import requests
+import httpx
 from datetime import datetime, timedelta
 import os
 import logging
@@ -47,11 +47,12 @@ async def send_otp(request: SendOTPRequest):
         url = f"https://sms.renflair.in/V1.php?API={API_KEY}&PHONE={phone}&OTP={otp}"
 
         try:
-            # Call SMS API with timeout
-            response = requests.get(url, timeout=10)
+            # Call SMS API with timeout, without blocking the event loop
+            async with httpx.AsyncClient(timeout=10) as client:
+                response = await client.get(url)
             response.raise_for_status()
             logger.info(f"SMS API response for {phone}: {response.status_code}")
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"SMS API error for {phone}: {str(e)}")
             # Still return success even if SMS fails, for development
             return {
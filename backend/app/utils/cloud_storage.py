@@ -2,6 +2,7 @@
 Cloud Storage Service for handling image uploads
 Supports Cloudinary, AWS S3, and other cloud storage providers
 """
+import io
 import os
 import base64
 import cloudinary
@@ -80,6 +81,75 @@ class CloudStorageService:
                 detail=f"Image upload failed: {str(e)}"
             )
     
+    async def upload_bytes(self, image_bytes: bytes, mime_type: str = "image/jpeg", folder: str = "products") -> str:
+        """
+        Upload raw image bytes to cloud storage and return public URL
+
+        Skips the base64 data-URI round-trip of upload_image - the bytes are
+        handed to the provider as-is.
+
+        Args:
+            image_bytes: Raw image bytes
+            mime_type: MIME type of the image (e.g. image/png)
+            folder: Folder name in cloud storage
+
+        Returns:
+            Public URL of uploaded image
+        """
+        try:
+            image_type = mime_type.split('/')[-1]
+            if image_type == 'jpeg':
+                image_type = 'jpg'
+
+            # Validate image type
+            allowed_types = {'jpg', 'jpeg', 'png', 'gif', 'webp'}
+            if image_type not in allowed_types:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Image type '{image_type}' not allowed. Allowed: {allowed_types}"
+                )
+
+            # Generate unique filename
+            unique_id = str(uuid.uuid4())
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            public_id = f"{folder}/{timestamp}_{unique_id}"
+
+            if self.provider == "cloudinary":
+                try:
+                    result = cloudinary.uploader.upload(
+                        io.BytesIO(image_bytes),
+                        public_id=public_id,
+                        overwrite=True,
+                        resource_type="image",
+                        format="jpg",  # Convert all to jpg for consistency
+                        quality="auto:good",
+                        fetch_format="auto"
+                    )
+                    return result.get("secure_url")
+                except Exception as e:
+                    raise Exception(f"Cloudinary upload failed: {str(e)}")
+            else:
+                # Fallback to local storage if cloud storage not configured
+                from pathlib import Path
+
+                upload_dir = Path(__file__).parent.parent.parent / "uploads" / "products"
+                upload_dir.mkdir(parents=True, exist_ok=True)
+
+                filename = f"{unique_id}.{image_type}"
+                with open(upload_dir / filename, "wb") as f:
+                    f.write(image_bytes)
+
+                # Return relative URL (will be served by FastAPI StaticFiles)
+                return f"/uploads/products/{filename}"
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Image upload failed: {str(e)}"
+            )
+
     async def _upload_to_cloudinary(self, base64_data: str, public_id: str) -> str:
         """Upload to Cloudinary and return URL"""
         try:
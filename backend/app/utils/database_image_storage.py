@@ -3,18 +3,29 @@ Database Image Storage Service
 Stores images directly in MongoDB as Base64 data
 """
 import base64
+import hashlib
 import uuid
 from typing import Optional, Dict, Any
+from bson import ObjectId
 from fastapi import HTTPException, status
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
 from datetime import datetime
 import re
 
 class DatabaseImageService:
     """Service for storing images directly in database"""
-    
+
     def __init__(self, db):
         self.db = db
         self.images_collection = db.images
+        self._gridfs = None
+
+    @property
+    def gridfs(self) -> AsyncIOMotorGridFSBucket:
+        """Lazily created GridFS bucket for large image bodies"""
+        if self._gridfs is None:
+            self._gridfs = AsyncIOMotorGridFSBucket(self.db, bucket_name="images")
+        return self._gridfs
     
     async def store_image(self, 
                          image_file = None,
@@ -40,16 +51,18 @@ class DatabaseImageService:
             if image_file is not None:
                 # Read file content
                 content = await image_file.read()
-                # Convert to base64
-                base64_data = base64.b64encode(content).decode('utf-8')
                 content_type = image_file.content_type or 'image/jpeg'
-                
-                # Create data URI format
-                base64_string = f"data:{content_type};base64,{base64_data}"
-                
+
                 # Reset file pointer for any subsequent reads
                 await image_file.seek(0)
-            
+
+                # Hand the raw bytes straight to store_bytes - building a
+                # data URI here only to re-split and re-decode it below would
+                # copy the image several extra times
+                return await self.store_bytes(
+                    content, content_type, product_id, vendor_id, image_type
+                )
+
             if not base64_string:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -68,7 +81,7 @@ class DatabaseImageService:
                 "image_data": image_data["base64"],
                 "content_type": image_data["content_type"],
                 "file_extension": image_data["extension"],
-                "file_size": len(base64.b64decode(image_data["base64"])),
+                "file_size": image_data["size"],
                 "created_at": datetime.utcnow(),
                 "updated_at": datetime.utcnow()
             }
@@ -88,6 +101,222 @@ class DatabaseImageService:
                 detail=f"Failed to store image: {str(e)}"
             )
     
+    async def store_bytes(self,
+                          image_bytes: bytes,
+                          content_type: str = "image/jpeg",
+                          product_id: str = None,
+                          vendor_id: str = None,
+                          image_type: str = "product") -> Dict[str, Any]:
+        """
+        Store raw image bytes in database and return image document
+
+        Skips the data-URI encode/parse round-trip of store_image - the bytes
+        are base64-encoded once for storage and nothing else.
+
+        Args:
+            image_bytes: Raw image bytes
+            content_type: MIME type of the image (e.g. image/png)
+            product_id: Associated product ID (optional)
+            vendor_id: Associated vendor ID (optional)
+            image_type: Type of image (product, avatar, etc.)
+
+        Returns:
+            Dictionary with image_id and metadata
+        """
+        try:
+            # Validate image type
+            allowed_types = {'image/jpg', 'image/jpeg', 'image/png', 'image/gif', 'image/webp'}
+            if content_type not in allowed_types:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Image type '{content_type}' not allowed"
+                )
+
+            # Create image document
+            image_doc = {
+                "_id": str(uuid.uuid4()),
+                "product_id": product_id,
+                "vendor_id": vendor_id,
+                "image_type": image_type,
+                "image_data": base64.b64encode(image_bytes).decode('utf-8'),
+                "content_type": content_type,
+                "file_extension": content_type.split('/')[1],
+                "file_size": len(image_bytes),
+                "created_at": datetime.utcnow(),
+                "updated_at": datetime.utcnow()
+            }
+
+            # Store in database
+            await self.images_collection.insert_one(image_doc)
+
+            return {
+                "image_id": image_doc["_id"],
+                "content_type": image_doc["content_type"],
+                "file_size": image_doc["file_size"]
+            }
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to store image: {str(e)}"
+            )
+
+    async def store_bytes_gridfs(self,
+                                 image_bytes: bytes,
+                                 content_type: str = "image/jpeg",
+                                 product_id: str = None,
+                                 vendor_id: str = None,
+                                 image_type: str = "product") -> Dict[str, Any]:
+        """
+        Store raw image bytes in GridFS and return image metadata
+
+        Unlike the inline documents written by store_bytes, GridFS chunks the
+        body, so payloads are not bounded by the 16 MB BSON document limit
+        and the images collection's working set stays index-sized. Identical
+        payloads are deduplicated by SHA-1 of the body.
+
+        Args:
+            image_bytes: Raw image bytes
+            content_type: MIME type of the image (e.g. image/png)
+            product_id: Associated product ID (optional)
+            vendor_id: Associated vendor ID (optional)
+            image_type: Type of image (product, avatar, etc.)
+
+        Returns:
+            Dictionary with image_id and metadata
+        """
+        try:
+            allowed_types = {'image/jpg', 'image/jpeg', 'image/png', 'image/gif', 'image/webp'}
+            if content_type not in allowed_types:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Image type '{content_type}' not allowed"
+                )
+
+            # Skip the upload entirely if these exact bytes are already stored
+            sha1 = hashlib.sha1(bytes(image_bytes)).hexdigest()
+            existing = await self.db["images.files"].find_one(
+                {"metadata.sha1": sha1}, {"_id": 1, "length": 1}
+            )
+            if existing:
+                return {
+                    "image_id": str(existing["_id"]),
+                    "content_type": content_type,
+                    "file_size": existing["length"],
+                    "deduplicated": True
+                }
+
+            file_id = await self.gridfs.upload_from_stream(
+                f"{uuid.uuid4()}.{content_type.split('/')[1]}",
+                image_bytes,
+                metadata={
+                    "product_id": product_id,
+                    "vendor_id": vendor_id,
+                    "image_type": image_type,
+                    "content_type": content_type,
+                    "sha1": sha1
+                }
+            )
+
+            return {
+                "image_id": str(file_id),
+                "content_type": content_type,
+                "file_size": len(image_bytes),
+                "deduplicated": False
+            }
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to store image: {str(e)}"
+            )
+
+    async def get_image_gridfs(self, image_id: str) -> Dict[str, Any]:
+        """Get raw image bytes and metadata from GridFS"""
+        try:
+            stream = await self.gridfs.open_download_stream(ObjectId(image_id))
+            data = await stream.read()
+            metadata = stream.metadata or {}
+
+            return {
+                "image_data": data,
+                "content_type": metadata.get("content_type", "image/jpeg"),
+                "file_size": stream.length
+            }
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Image not found: {str(e)}"
+            )
+
+    async def store_images_bulk(self,
+                                files,
+                                product_id: str = None,
+                                vendor_id: str = None,
+                                image_type: str = "product") -> list:
+        """
+        Store multiple upload files with a single insert_many round-trip
+
+        Args:
+            files: Iterable of UploadFile-like objects
+            product_id: Associated product ID (optional)
+            vendor_id: Associated vendor ID (optional)
+            image_type: Type of image (product, avatar, etc.)
+
+        Returns:
+            List of image IDs, in input order
+        """
+        try:
+            docs = []
+            for image_file in files:
+                content = await image_file.read()
+                content_type = image_file.content_type or 'image/jpeg'
+
+                allowed_types = {'image/jpg', 'image/jpeg', 'image/png', 'image/gif', 'image/webp'}
+                if content_type not in allowed_types:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Image type '{content_type}' not allowed"
+                    )
+
+                now = datetime.utcnow()
+                docs.append({
+                    "_id": str(uuid.uuid4()),
+                    "product_id": product_id,
+                    "vendor_id": vendor_id,
+                    "image_type": image_type,
+                    "image_data": base64.b64encode(content).decode('utf-8'),
+                    "content_type": content_type,
+                    "file_extension": content_type.split('/')[1],
+                    "file_size": len(content),
+                    "created_at": now,
+                    "updated_at": now
+                })
+
+            if not docs:
+                return []
+
+            # One round-trip for the whole batch; ordered=False lets the
+            # server insert concurrently
+            await self.images_collection.insert_many(docs, ordered=False)
+
+            return [doc["_id"] for doc in docs]
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to store images: {str(e)}"
+            )
+
     async def get_image(self, image_id: str) -> Dict[str, Any]:
         """Get image data from database"""
         try:
@@ -166,17 +395,19 @@ class DatabaseImageService:
                 detail=f"Image type '{content_type}' not allowed"
             )
         
-        # Validate base64 data
+        # Validate base64 data (and reuse the decode for the size instead of
+        # decoding the payload a second time)
         try:
-            base64.b64decode(base64_data)
+            decoded = base64.b64decode(base64_data)
         except Exception:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid base64 image data"
             )
-        
+
         return {
             "base64": base64_data,
             "content_type": content_type,
-            "extension": extension
+            "extension": extension,
+            "size": len(decoded)
         }
\ No newline at end of file
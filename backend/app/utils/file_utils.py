@@ -1,7 +1,9 @@
 """File handling utilities for uploads and media processing."""
 
+import asyncio
 import os
 import uuid
+from functools import lru_cache
 from typing import List, Optional
 from fastapi import UploadFile, HTTPException
 import aiofiles
@@ -100,7 +102,8 @@ async def process_image(
     crop_to_square: bool = False
 ) -> str:
     """Process and optimize image file with optional square cropping."""
-    try:
+
+    def _process() -> str:
         with Image.open(file_path) as img:
             # Convert to RGB if necessary (for JPEG compatibility)
             if img.mode in ('RGBA', 'LA', 'P'):
@@ -111,7 +114,7 @@ async def process_image(
                 else:
                     background.paste(img)
                 img = background
-            
+
             # Crop to square if requested (center crop)
             if crop_to_square:
                 width, height = img.size
@@ -121,15 +124,19 @@ async def process_image(
                 right = left + min_dimension
                 bottom = top + min_dimension
                 img = img.crop((left, top, right, bottom))
-            
+
             # Resize if needed while maintaining aspect ratio
             if img.width > max_width or img.height > max_height:
                 img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
-            
+
             # Save optimized image
             img.save(file_path, 'JPEG', quality=quality, optimize=True)
-            
+
         return file_path
+
+    try:
+        # CPU-bound decode/resize/encode runs off the event loop
+        return await asyncio.to_thread(_process)
     except Exception as e:
         print(f"Error processing image: {str(e)}")
         import traceback
@@ -137,9 +144,25 @@ async def process_image(
         raise HTTPException(status_code=500, detail=f"Failed to process image: {str(e)}")
 
 
-def get_file_url(file_path: str, base_url: str = "/uploads") -> str:
-    """Convert file path to URL."""
-    
+@lru_cache(maxsize=1)
+def _default_url_settings() -> tuple:
+    """Resolve (environment, backend_url) once instead of on every call."""
+    from app.config import ENVIRONMENT
+    return ENVIRONMENT, os.getenv("BACKEND_URL", "")
+
+
+def get_file_url(
+    file_path: str,
+    base_url: str = "/uploads",
+    environment: Optional[str] = None,
+    backend_url: Optional[str] = None
+) -> str:
+    """Convert file path to URL.
+
+    environment and backend_url default to the cached app configuration;
+    tests can pass them explicitly instead of reloading config modules.
+    """
+
     # If it's already a full URL (cloud storage), return as is
     if file_path.startswith(('http://', 'https://')):
         return file_path
@@ -162,12 +185,15 @@ def get_file_url(file_path: str, base_url: str = "/uploads") -> str:
         base_url = f'/{base_url}'
     base_url = base_url.rstrip('/')
     
-    # Check environment configuration
-    from app.config import ENVIRONMENT
-    backend_url = os.getenv("BACKEND_URL", "")
-    
+    # Fill in whichever settings the caller didn't inject
+    default_environment, default_backend_url = _default_url_settings()
+    if environment is None:
+        environment = default_environment
+    if backend_url is None:
+        backend_url = default_backend_url
+
     # For development environment, use local backend URL
-    if ENVIRONMENT == "development":
+    if environment == "development":
         domain = backend_url or "http://localhost:5858"
         domain = domain.rstrip('/')
         final_url = f"{domain}{base_url}/{relative_path}"
@@ -194,7 +220,8 @@ async def create_thumbnail(
     crop_to_square: bool = True
 ) -> str:
     """Create thumbnail for image file with optional square crop."""
-    try:
+
+    def _create() -> str:
         with Image.open(file_path) as img:
             # Convert to RGB if necessary
             if img.mode in ('RGBA', 'LA', 'P'):
@@ -205,7 +232,7 @@ async def create_thumbnail(
                 else:
                     background.paste(img)
                 img = background
-            
+
             # Crop to square (center crop) for thumbnails
             if crop_to_square:
                 width, height = img.size
@@ -215,16 +242,20 @@ async def create_thumbnail(
                 right = left + min_dimension
                 bottom = top + min_dimension
                 img = img.crop((left, top, right, bottom))
-            
+
             # Create thumbnail maintaining aspect ratio
             img.thumbnail(size, Image.Resampling.LANCZOS)
-            
+
             # Save thumbnail
             name, ext = os.path.splitext(file_path)
             thumb_path = f"{name}_thumb{ext}"
             img.save(thumb_path, 'JPEG', quality=85, optimize=True)
-            
+
         return thumb_path
+
+    try:
+        # CPU-bound decode/resize/encode runs off the event loop
+        return await asyncio.to_thread(_create)
     except Exception as e:
         print(f"Error creating thumbnail: {str(e)}")
         import traceback
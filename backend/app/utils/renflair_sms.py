@@ -4,7 +4,7 @@ Handles OTP sending and verification using Renflair SMS API
 """
 
 import os
-import requests
+import httpx
 import logging
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
@@ -39,8 +39,9 @@ class RenflairSMSService:
             # Build URL exactly like PHP code
             url = f"{self.base_url}?API={self.api_key}&PHONE={clean_phone}&OTP={otp}"
             
-            # Make request (equivalent to PHP curl)
-            response = requests.get(url, timeout=10)
+            # Make request (equivalent to PHP curl) without blocking the loop
+            async with httpx.AsyncClient(timeout=10) as client:
+                response = await client.get(url)
             
             if response.status_code == 200:
                 try:
@@ -90,7 +91,7 @@ class RenflairSMSService:
                     "provider": "renflair"
                 }
         
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Renflair request failed: {str(e)}")
             return {
                 "success": False,
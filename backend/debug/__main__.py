@@ -0,0 +1,43 @@
+"""
+Shared driver for the standalone debug scripts.
+
+Running each script separately pays a fresh event loop, motor client and
+connection-pool warmup per invocation. `python -m debug` (from the backend
+directory) runs the database-side diagnostics on one loop with one client.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# The debug scripts live in the backend root and expect it on sys.path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.connection import connect_to_mongo, close_mongo_connection
+
+from debug_images import test_database_connection
+from debug_products import check_products
+from diagnose_data_persistence import diagnose_data_persistence
+
+async def main():
+    print("🔍 Running combined debug diagnostics")
+    print("=" * 50)
+
+    # Connect once and share the motor client across every diagnostic
+    success = await connect_to_mongo()
+    if not success:
+        print("❌ Failed to connect to database")
+        return
+
+    try:
+        await asyncio.gather(
+            diagnose_data_persistence(),
+            check_products(),
+            test_database_connection()
+        )
+    finally:
+        await close_mongo_connection()
+
+    print("\n✅ Combined debug run complete!")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -8,17 +8,22 @@ import json
 from pathlib import Path
 from PIL import Image
 import io
-import base64
 
-async def test_image_upload_debug():
-    """Test image upload with detailed debugging"""
-    
-    # Create a simple test image
-    print("📸 Creating test image...")
+def _make_test_png() -> io.BytesIO:
+    """Build the test PNG synchronously (run off the event loop)."""
     img = Image.new('RGB', (100, 100), color='red')
     img_bytes = io.BytesIO()
-    img.save(img_bytes, format='PNG')
+    # Uncompressed PNG - no point paying the DEFLATE pass for a throwaway test image
+    img.save(img_bytes, format='PNG', compress_level=0, optimize=False)
     img_bytes.seek(0)
+    return img_bytes
+
+async def test_image_upload_debug():
+    """Test image upload with detailed debugging"""
+
+    # Create a simple test image in a worker thread so PIL doesn't block the loop
+    print("📸 Creating test image...")
+    img_bytes = await asyncio.to_thread(_make_test_png)
     
     # Test data for product creation
     test_product_data = {
@@ -38,7 +43,21 @@ async def test_image_upload_debug():
         "password": "vendor123"  # Update with actual password
     }
     
-    async with aiohttp.ClientSession() as session:
+    # Single pooled session with an explicit timeout for all four requests.
+    # Long DNS cache + keep-alive so every request after the first reuses the
+    # same resolved address and TLS/TCP connection to Render.
+    connector = aiohttp.TCPConnector(
+        limit=20,
+        ttl_dns_cache=600,
+        use_dns_cache=True,
+        keepalive_timeout=60,
+        enable_cleanup_closed=True
+    )
+    timeout = aiohttp.ClientTimeout(total=30, connect=5)
+
+    async with aiohttp.ClientSession(
+        connector=connector, timeout=timeout, headers={"Connection": "keep-alive"}
+    ) as session:
         try:
             # Step 1: Login
             print("🔐 Attempting login...")
@@ -91,8 +110,10 @@ async def test_image_upload_debug():
                 for key, value in test_product_data.items():
                     data.add_field(key, value)
                 
-                # Add image
-                data.add_field('images', img_bytes.getvalue(), filename='test_debug.png', content_type='image/png')
+                # Add image - pass the file object so aiohttp streams it in chunks
+                # instead of buffering a full bytes copy in the send buffer
+                img_bytes.seek(0)
+                data.add_field('images', img_bytes, filename='test_debug.png', content_type='image/png')
                 
                 async with session.post("https://adorona.onrender.com/api/products", data=data, headers=headers) as response:
                     print(f"Product creation (with images) status: {response.status}")
@@ -7,18 +7,17 @@ import aiohttp
 import sys
 sys.path.append('.')
 
-async def test_backend_connection():
+async def test_backend_connection(session):
     """Test if backend is reachable"""
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get("http://localhost:5858/") as response:
-                if response.status == 200:
-                    data = await response.json()
-                    print(f"✅ Backend is running: {data}")
-                    return True
-                else:
-                    print(f"❌ Backend returned {response.status}")
-                    return False
+        async with session.get("http://localhost:5858/") as response:
+            if response.status == 200:
+                data = await response.json()
+                print(f"✅ Backend is running: {data}")
+                return True
+            else:
+                print(f"❌ Backend returned {response.status}")
+                return False
     except Exception as e:
         print(f"❌ Cannot connect to backend: {e}")
         return False
@@ -45,13 +44,22 @@ async def test_database_connection():
             print(f"🖼️ Found {image_count} images in database")
             
             # Get first few images to inspect
+            # Compute the base64 payload size server-side with $strLenCP so the
+            # blobs themselves never cross the wire
             if image_count > 0:
-                images = await db.images.find().limit(3).to_list(3)
-                for img in images:
+                pipeline = [
+                    {"$limit": 3},
+                    {"$project": {
+                        "content_type": 1,
+                        "product_id": 1,
+                        "data_size": {"$strLenCP": {"$ifNull": ["$image_data", ""]}}
+                    }}
+                ]
+                async for img in db.images.aggregate(pipeline):
                     print(f"   Image ID: {img['_id']}")
                     print(f"   Content Type: {img.get('content_type', 'unknown')}")
                     print(f"   Product ID: {img.get('product_id', 'none')}")
-                    print(f"   Data Size: {len(img.get('image_data', ''))} chars")
+                    print(f"   Data Size: {img.get('data_size', 0)} chars")
                     print("   ---")
         else:
             print("❌ No 'images' collection found in database")
@@ -84,36 +92,40 @@ async def test_database_connection():
         traceback.print_exc()
         return False
 
-async def test_api_endpoints():
+async def test_api_endpoints(session):
     """Test specific API endpoints"""
     try:
-        async with aiohttp.ClientSession() as session:
-            # Test non-existent image
-            url = "http://localhost:5858/api/images/test123"
-            async with session.get(url) as response:
-                print(f"🔍 Testing {url}")
-                print(f"   Status: {response.status}")
-                print(f"   Response: {await response.text()}")
-                
+        # Test non-existent image
+        url = "http://localhost:5858/api/images/test123"
+        async with session.get(url) as response:
+            print(f"🔍 Testing {url}")
+            print(f"   Status: {response.status}")
+            print(f"   Response: {await response.text()}")
+
     except Exception as e:
         print(f"❌ API test failed: {e}")
 
 async def main():
     print("🔍 Debugging Image Issues")
     print("=" * 40)
-    
-    # Test backend connection
-    print("\n1️⃣ Testing Backend Connection...")
-    backend_ok = await test_backend_connection()
-    
-    if backend_ok:
-        print("\n2️⃣ Testing Database Connection...")
-        db_ok = await test_database_connection()
-        
-        if db_ok:
-            print("\n3️⃣ Testing API Endpoints...")
-            await test_api_endpoints()
-    
+
+    # One pooled session for all HTTP checks - avoids a fresh TCP handshake per test
+    connector = aiohttp.TCPConnector(limit=50, ttl_dns_cache=300, keepalive_timeout=30)
+    timeout = aiohttp.ClientTimeout(total=30, connect=5)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        # Test backend connection
+        print("\n1️⃣ Testing Backend Connection...")
+        backend_ok = await test_backend_connection(session)
+
+        if backend_ok:
+            print("\n2️⃣ Testing Database Connection...")
+            db_ok = await test_database_connection()
+
+            if db_ok:
+                print("\n3️⃣ Testing API Endpoints...")
+                await test_api_endpoints(session)
+
     print("\n✅ Debug complete!")
 
 if __name__ == "__main__":
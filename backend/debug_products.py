@@ -21,7 +21,10 @@ async def check_products():
         print("✅ Database connection available")
         
         # Get a few products to inspect their image structure
-        products = await db.products.find().limit(3).to_list(3)
+        # Project only the fields we print so large descriptions etc. stay server-side
+        products = await db.products.find(
+            {}, {"name": 1, "price": 1, "images": 1, "image": 1}
+        ).limit(3).to_list(3)
         
         print(f"🔍 Found {len(products)} products to inspect")
         
@@ -58,40 +61,44 @@ async def check_products():
         traceback.print_exc()
         return False
 
-async def test_static_serving():
+async def test_static_serving(session):
     """Test if static files are being served correctly"""
     try:
-        async with aiohttp.ClientSession() as session:
-            # Test the known image path
-            image_url = "http://localhost:5858/uploads/products/6937b8f2b28ae58aaee4f367/6937d8ab3b14d9a5008737a9/products_6937b8f2b28ae58aaee4f367_6937d8ab3b14d9a5008737a9_09d3c413-b9bc-4de6-891d-6e0d0e49f091.png"
-            
-            async with session.get(image_url) as response:
-                print(f"\n🌐 Testing image serving:")
-                print(f"   URL: {image_url}")
-                print(f"   Status: {response.status}")
-                print(f"   Content-Type: {response.headers.get('content-type')}")
-                print(f"   Content-Length: {response.headers.get('content-length')}")
-                
-                if response.status == 200:
-                    print("   ✅ Image is being served correctly!")
-                else:
-                    print(f"   ❌ Image serving failed: {await response.text()}")
-                    
+        # Test the known image path
+        image_url = "http://localhost:5858/uploads/products/6937b8f2b28ae58aaee4f367/6937d8ab3b14d9a5008737a9/products_6937b8f2b28ae58aaee4f367_6937d8ab3b14d9a5008737a9_09d3c413-b9bc-4de6-891d-6e0d0e49f091.png"
+
+        async with session.get(image_url) as response:
+            print(f"\n🌐 Testing image serving:")
+            print(f"   URL: {image_url}")
+            print(f"   Status: {response.status}")
+            print(f"   Content-Type: {response.headers.get('content-type')}")
+            print(f"   Content-Length: {response.headers.get('content-length')}")
+
+            if response.status == 200:
+                print("   ✅ Image is being served correctly!")
+            else:
+                print(f"   ❌ Image serving failed: {await response.text()}")
+
     except Exception as e:
         print(f"❌ Static serving test failed: {e}")
 
 async def main():
     print("🔍 Debugging Product Image Issues")
     print("=" * 50)
-    
-    # Check product data structure
-    print("\n1️⃣ Checking Product Data Structure...")
-    await check_products()
-    
-    # Test static file serving
-    print("\n2️⃣ Testing Static File Serving...")
-    await test_static_serving()
-    
+
+    # One pooled session for all HTTP checks - avoids a fresh TCP handshake per test
+    connector = aiohttp.TCPConnector(limit=50, ttl_dns_cache=300, keepalive_timeout=30)
+    timeout = aiohttp.ClientTimeout(total=30, connect=5)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        # Check product data structure
+        print("\n1️⃣ Checking Product Data Structure...")
+        await check_products()
+
+        # Test static file serving
+        print("\n2️⃣ Testing Static File Serving...")
+        await test_static_serving(session)
+
     print("\n✅ Debug complete!")
 
 if __name__ == "__main__":
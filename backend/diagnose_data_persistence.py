@@ -54,12 +54,12 @@ async def diagnose_data_persistence():
         print(f"   ✅ Active products: {active_products}")
         print(f"   🗑️ Deleted products: {deleted_products}")
         
-        # Check recent products
-        recent_products = await db.products.find(
+        # Check recent products (count server-side, no need to fetch the documents)
+        recent_count = await db.products.count_documents(
             {"created_at": {"$gte": datetime.utcnow() - timedelta(days=7)}}
-        ).to_list(None)
-        
-        print(f"   🕐 Products created in last 7 days: {len(recent_products)}")
+        )
+
+        print(f"   🕐 Products created in last 7 days: {recent_count}")
         
         # Check for TTL indexes
         print(f"\\n🕒 TTL Index Analysis:")
@@ -81,12 +81,13 @@ async def diagnose_data_persistence():
         total_vendors = await db.vendors.count_documents({})
         print(f"   👤 Total vendors: {total_vendors}")
         
-        # Check orphaned products
-        products_with_vendors = await db.products.aggregate([
+        # Check orphaned products - terminate the pipeline with $count so only
+        # the number crosses the wire instead of every orphaned document
+        orphan_result = await db.products.aggregate([
             {
                 "$lookup": {
                     "from": "vendors",
-                    "localField": "vendor_id", 
+                    "localField": "vendor_id",
                     "foreignField": "_id",
                     "as": "vendor"
                 }
@@ -96,10 +97,12 @@ async def diagnose_data_persistence():
                     "vendor": {"$size": 0},  # No matching vendor
                     "deleted": {"$ne": True}
                 }
-            }
-        ]).to_list(None)
-        
-        print(f"   ⚠️ Orphaned products (no vendor): {len(products_with_vendors)}")
+            },
+            {"$count": "orphan_count"}
+        ]).to_list(1)
+
+        orphan_count = orphan_result[0]["orphan_count"] if orphan_result else 0
+        print(f"   ⚠️ Orphaned products (no vendor): {orphan_count}")
         
         # Check for patterns that might trigger cleanup
         print(f"\\n🔍 Pattern Analysis (potential cleanup triggers):")
@@ -6,10 +6,22 @@ import asyncio
 import sys
 sys.path.append('.')
 
+from pymongo import UpdateOne
+from pymongo.write_concern import WriteConcern
+
 from app.db.connection import get_database, connect_to_mongo
 from app.config import BACKEND_URL
 import os
 
+# Bound concurrent product processing so we don't exhaust the Mongo connection pool
+sem = asyncio.Semaphore(10)
+
+# URL-classification needles, hoisted out of the per-image hot loop
+_UPLOADS = "/uploads/"
+_HOST = "adorona.onrender.com"
+_STATIC = "/Images/"
+_API_IMG = "/api/images/"
+
 async def fix_broken_images():
     """Fix broken image URLs in products"""
     
@@ -25,114 +37,119 @@ async def fix_broken_images():
     db = get_database()
     products_collection = db.products
     
-    # Get all products with images
+    # Partial index so the query below runs as an IXSCAN over products that
+    # actually have a non-empty images array instead of a full collection
+    # scan. Best-effort: the cleanup works the same without it, just slower.
+    try:
+        await products_collection.create_index(
+            [("images.0", 1)],
+            partialFilterExpression={"images.0": {"$exists": True}},
+            name="has_images_partial"
+        )
+    except Exception as e:
+        print(f"⚠️  Could not create partial index, continuing without: {e}")
+
+    # Get all products with a non-empty images array (same predicate the
+    # partial index covers)
     products = await products_collection.find({
-        "images": {"$exists": True, "$ne": []}
+        "images.0": {"$exists": True}
     }).to_list(None)
     
     print(f"📊 Found {len(products)} products with images")
     
     backend_url = BACKEND_URL or "https://adorona.onrender.com"
+
+    # Process products concurrently, bounded by the semaphore. Each task
+    # returns an UpdateOne op (or None) instead of writing individually.
+    results = await asyncio.gather(*(process_product(product) for product in products))
+    ops = [op for op in results if op is not None]
+
+    # One unordered bulk write with relaxed write concern. This is a one-off
+    # cleanup script - a dropped write is recoverable by re-running it.
     updated_count = 0
-    
-    for product in products:
+    if ops:
+        write_collection = db.get_collection(
+            "products", write_concern=WriteConcern(w=1, j=False)
+        )
+        bulk_result = await write_collection.bulk_write(ops, ordered=False)
+        updated_count = bulk_result.modified_count
+
+    print(f"\n🎉 Cleanup completed!")
+    print(f"   📊 Products updated: {updated_count}")
+    print(f"   💡 Note: Broken upload URLs were removed (files lost on Render's ephemeral storage)")
+    print(f"   💡 To add new images, upload them through the product management interface")
+
+def _normalize(item):
+    """Return (url, existing_obj_or_None) for either image shape."""
+    if isinstance(item, str):
+        return item, None
+    return item.get("url", ""), item
+
+def _make_image_obj(url, alt_prefix, position):
+    """Build the dict image format for a bare URL string."""
+    return {
+        "url": url,
+        "thumbnail_url": url,
+        "alt_text": alt_prefix + str(position + 1),
+        "is_primary": position == 0,
+        "sort_order": position
+    }
+
+async def process_product(product):
+    """Fix one product's image list. Returns an UpdateOne op if it changed."""
+    product_id = str(product["_id"])
+    async with sem:
         try:
-            product_id = str(product["_id"])
             product_name = product.get('name', 'Unknown')
             print(f"\n🔄 Processing: {product_name} ({product_id})")
-            
+
             original_images = product.get("images", [])
             fixed_images = []
             needs_update = False
-            
-            for i, image_item in enumerate(original_images):
-                if isinstance(image_item, dict):
-                    # New format with url, thumbnail_url, etc.
-                    image_url = image_item.get("url", "")
-                    
-                    # Check if it's a broken uploads URL
-                    if "/uploads/" in image_url and "adorona.onrender.com" in image_url:
-                        print(f"  🔧 Fixing broken uploads URL: {image_url}")
-                        # For now, remove broken images or replace with placeholder
-                        # Since we can't recover the lost images, we'll skip them
-                        needs_update = True
-                        print(f"    ❌ Removing broken image URL (file lost on Render)")
-                        continue  # Skip this broken image
-                    elif "/Images/" in image_url:
-                        print(f"  📷 Frontend static image: {image_url}")
-                        # These are frontend static images, keep them
-                        fixed_images.append(image_item)
-                    elif "/api/images/" in image_url:
-                        print(f"  ✅ Valid database image: {image_url}")
-                        # These are database images, keep them
-                        fixed_images.append(image_item)
-                    else:
-                        print(f"  ❓ Unknown image format: {image_url}")
-                        # Keep unknown formats
-                        fixed_images.append(image_item)
-                        
-                elif isinstance(image_item, str):
-                    # Old format - just a string URL
-                    if "/uploads/" in image_item and "adorona.onrender.com" in image_item:
-                        print(f"  🔧 Fixing broken uploads URL: {image_item}")
-                        needs_update = True
-                        print(f"    ❌ Removing broken image URL (file lost on Render)")
-                        continue  # Skip this broken image
-                    elif "/Images/" in image_item:
-                        print(f"  📷 Frontend static image: {image_item}")
-                        # Convert to new format
-                        new_image_obj = {
-                            "url": image_item,
-                            "thumbnail_url": image_item,
-                            "alt_text": f"{product_name} - Image {len(fixed_images)+1}",
-                            "is_primary": len(fixed_images) == 0,
-                            "sort_order": len(fixed_images)
-                        }
-                        fixed_images.append(new_image_obj)
-                        needs_update = True
-                    elif "/api/images/" in image_item:
-                        print(f"  ✅ Valid database image: {image_item}")
-                        # Convert to new format
-                        new_image_obj = {
-                            "url": image_item,
-                            "thumbnail_url": image_item,
-                            "alt_text": f"{product_name} - Image {len(fixed_images)+1}",
-                            "is_primary": len(fixed_images) == 0,
-                            "sort_order": len(fixed_images)
-                        }
-                        fixed_images.append(new_image_obj)
-                        needs_update = True
-                    else:
-                        print(f"  ❓ Unknown image format: {image_item}")
-                        # Convert to new format
-                        new_image_obj = {
-                            "url": image_item,
-                            "thumbnail_url": image_item,
-                            "alt_text": f"{product_name} - Image {len(fixed_images)+1}",
-                            "is_primary": len(fixed_images) == 0,
-                            "sort_order": len(fixed_images)
-                        }
-                        fixed_images.append(new_image_obj)
-                        needs_update = True
-            
-            # Update product if needed
+            # Format the constant part of the alt text once, not per image
+            alt_prefix = product_name + " - Image "
+
+            for image_item in original_images:
+                # Both the old string format and the new dict format classify
+                # by URL, so normalize once and branch on the URL alone
+                image_url, existing = _normalize(image_item)
+
+                # Check if it's a broken uploads URL
+                if _UPLOADS in image_url and _HOST in image_url:
+                    print(f"  🔧 Fixing broken uploads URL: {image_url}")
+                    # Since we can't recover the lost images, we'll skip them
+                    needs_update = True
+                    print(f"    ❌ Removing broken image URL (file lost on Render)")
+                    continue  # Skip this broken image
+                elif _STATIC in image_url:
+                    print(f"  📷 Frontend static image: {image_url}")
+                elif _API_IMG in image_url:
+                    print(f"  ✅ Valid database image: {image_url}")
+                else:
+                    print(f"  ❓ Unknown image format: {image_url}")
+
+                if existing is not None:
+                    # Already in the dict format, keep as-is
+                    fixed_images.append(existing)
+                else:
+                    # Old string format - convert to the dict format
+                    fixed_images.append(_make_image_obj(image_url, alt_prefix, len(fixed_images)))
+                    needs_update = True
+
+            # Queue the update for the bulk write if needed
             if needs_update:
-                await products_collection.update_one(
+                print(f"  ✅ Queued update: {len(original_images)} → {len(fixed_images)} images")
+                return UpdateOne(
                     {"_id": product["_id"]},
                     {"$set": {"images": fixed_images}}
                 )
-                updated_count += 1
-                print(f"  ✅ Updated: {len(original_images)} → {len(fixed_images)} images")
             else:
                 print(f"  ℹ️  No changes needed")
-                
+                return None
+
         except Exception as e:
             print(f"  ❌ Error processing product {product_id}: {e}")
-    
-    print(f"\n🎉 Cleanup completed!")
-    print(f"   📊 Products updated: {updated_count}")
-    print(f"   💡 Note: Broken upload URLs were removed (files lost on Render's ephemeral storage)")
-    print(f"   💡 To add new images, upload them through the product management interface")
+            return None
 
 if __name__ == "__main__":
     asyncio.run(fix_broken_images())
\ No newline at end of file
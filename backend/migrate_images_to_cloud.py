@@ -3,20 +3,91 @@ Migration script to move existing images from local storage to cloud storage
 and update database URLs accordingly.
 """
 import asyncio
+import hashlib
 import os
 import sys
 from pathlib import Path
 
+# Resolved once at import - keeps the stat syscalls out of the per-image path
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+
 # Add the backend directory to Python path
-backend_dir = Path(__file__).parent.parent
-sys.path.append(str(backend_dir))
+sys.path.append(str(BACKEND_ROOT))
+
+import aiohttp
+from pymongo import UpdateOne
 
-from app.db.connection import get_database
+from app.db.connection import get_database, connect_to_mongo, close_mongo_connection
 from app.utils.cloud_storage import cloud_storage
-import base64
-import requests
 from urllib.parse import urlparse
 
+# Flush accumulated product updates in batches of this size
+BULK_BATCH_SIZE = 500
+
+# Image URLs starting with these prefixes are already in cloud storage
+_CLOUD_PREFIXES = ("https://res.cloudinary.com", "https://cloudinary.com")
+_CLOUD_REGEX = "^(https://res\\.cloudinary\\.com|https://cloudinary\\.com)"
+
+# File-extension → MIME type table for migrated images
+_MIME = {
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+    "gif": "image/gif"
+}
+
+def _resolve_local(image_path: str) -> Path:
+    """Map the stored path formats (/uploads/..., uploads/..., bare filename) to a local file path."""
+    if image_path.startswith("/uploads"):
+        return BACKEND_ROOT / image_path.lstrip("/")
+    if image_path.startswith("uploads"):
+        return BACKEND_ROOT / image_path
+    # Assume it's a filename in uploads
+    return BACKEND_ROOT / "uploads" / image_path
+
+# Bound concurrent downloads/uploads so we don't flood Cloudinary or the DB pool
+sem = asyncio.Semaphore(16)
+
+# Content-hash → cloud URL cache so identical bytes are only uploaded once.
+# Persisted in the image_hashes collection and preloaded per run, which also
+# makes re-running the migration cheap.
+hash_cache = {}
+
+async def _check_hash_cache(image_bytes) -> tuple:
+    """Return (content_hash, cached_cloud_url_or_None) for the given bytes."""
+    content_hash = hashlib.blake2b(bytes(image_bytes), digest_size=16).hexdigest()
+    return content_hash, hash_cache.get(content_hash)
+
+async def _record_hash(content_hash: str, cloud_url: str):
+    """Remember an uploaded image's hash for this run and future ones."""
+    hash_cache[content_hash] = cloud_url
+    await get_database().image_hashes.update_one(
+        {"_id": content_hash}, {"$set": {"url": cloud_url}}, upsert=True
+    )
+
+async def read_response_bytes(response: aiohttp.ClientResponse) -> bytearray:
+    """Stream a response body in 64 KiB chunks into a preallocated buffer."""
+    # Sizing the buffer from Content-Length avoids repeated reallocation
+    # while the body streams in
+    length = int(response.headers.get('content-length', 0))
+    buf = bytearray(length)
+    pos = 0
+    async for chunk in response.content.iter_chunked(65536):
+        end = pos + len(chunk)
+        if end <= length:
+            buf[pos:end] = chunk
+        else:
+            # Body longer than the declared length (e.g. aiohttp decompressed
+            # a gzip response whose Content-Length was the compressed size):
+            # drop the unwritten preallocated tail before appending, so no
+            # zero gap ends up in the middle of the data
+            del buf[pos:]
+            buf += chunk
+        pos = end
+    del buf[pos:]
+    return buf
+
 async def migrate_images_to_cloud():
     """Migrate all existing product images to cloud storage"""
     
@@ -25,152 +96,201 @@ async def migrate_images_to_cloud():
     # Get database connection
     db = get_database()
     products_collection = db.products
+
+    # Preload previously uploaded content hashes so duplicates skip the upload
+    async for doc in db.image_hashes.find({}, {"url": 1}):
+        hash_cache[doc["_id"]] = doc["url"]
+    if hash_cache:
+        print(f"♻️  Loaded {len(hash_cache)} known image hashes")
     
-    # Get all products with images
-    products = await products_collection.find({
-        "images": {"$exists": True, "$ne": []}
-    }).to_list(None)
-    
-    print(f"📊 Found {len(products)} products with images")
-    
+    # Stream products with images instead of materializing them all in RAM,
+    # projecting just the fields the migration touches. The $elemMatch filter
+    # keeps fully migrated products server-side entirely.
+    query = {
+        "images": {
+            "$exists": True,
+            "$ne": [],
+            "$elemMatch": {"$not": {"$regex": _CLOUD_REGEX}}
+        }
+    }
+    product_count = await products_collection.count_documents(query)
+    print(f"📊 Found {product_count} products with images")
+
+    cursor = products_collection.find(
+        query, projection={"_id": 1, "name": 1, "images": 1}
+    ).batch_size(200)
+
     updated_count = 0
     error_count = 0
-    
-    for product in products:
+    ops = []
+
+    async def migrate_image(image_path: str, product_id: str) -> tuple:
+        """Migrate one image under the concurrency limit, keeping the original on failure.
+
+        Returns (url, changed) so the caller can queue updates without
+        re-comparing URL strings.
+        """
+        nonlocal error_count
+
+        # Skip if already a cloud URL (single C-level check over both prefixes)
+        if image_path.startswith(_CLOUD_PREFIXES):
+            print(f"    ✅ Already cloud URL, skipping: {image_path}")
+            return image_path, False
+
+        # Try to migrate the image
         try:
-            product_id = str(product["_id"])
-            print(f"\n🔄 Processing product: {product.get('name', 'Unknown')} ({product_id})")
-            
-            new_images = []
-            
-            for i, image_path in enumerate(product.get("images", [])):
-                print(f"  📸 Processing image {i+1}: {image_path}")
-                
-                # Skip if already a cloud URL
-                if image_path.startswith("https://res.cloudinary.com") or image_path.startswith("https://cloudinary.com"):
-                    print(f"    ✅ Already cloud URL, skipping")
-                    new_images.append(image_path)
-                    continue
-                
-                # Try to migrate the image
-                try:
-                    new_url = await migrate_single_image(image_path, product_id)
-                    if new_url:
-                        new_images.append(new_url)
-                        print(f"    ✅ Migrated to: {new_url}")
-                    else:
-                        # Keep original if migration fails
-                        new_images.append(image_path)
-                        print(f"    ⚠️  Migration failed, keeping original")
-                        
-                except Exception as e:
-                    print(f"    ❌ Error migrating image: {e}")
-                    new_images.append(image_path)  # Keep original
-                    error_count += 1
-            
-            # Update product with new image URLs
-            if new_images != product.get("images", []):
-                await products_collection.update_one(
-                    {"_id": product["_id"]},
-                    {"$set": {"images": new_images}}
-                )
-                updated_count += 1
-                print(f"  ✅ Updated product in database")
-            else:
-                print(f"  ℹ️  No changes needed")
-                
+            async with sem:
+                new_url = await migrate_single_image(image_path, product_id, session)
+            if new_url:
+                print(f"    ✅ Migrated to: {new_url}")
+                return new_url, True
+            # Keep original if migration fails
+            print(f"    ⚠️  Migration failed, keeping original: {image_path}")
+            return image_path, False
+
         except Exception as e:
-            print(f"  ❌ Error processing product {product_id}: {e}")
+            print(f"    ❌ Error migrating image: {e}")
             error_count += 1
-    
+            return image_path, False  # Keep original
+
+    # One pooled HTTP session for every URL download in the run; keep-alive
+    # amortizes the TCP+TLS handshake across all downloads from the same host
+    connector = aiohttp.TCPConnector(limit=32, limit_per_host=8, keepalive_timeout=60)
+    async with aiohttp.ClientSession(
+        connector=connector,
+        headers={"Accept-Encoding": "gzip, deflate"},
+        timeout=aiohttp.ClientTimeout(total=30)
+    ) as session:
+        async for product in cursor:
+            try:
+                product_id = str(product["_id"])
+                print(f"\n🔄 Processing product: {product.get('name', 'Unknown')} ({product_id})")
+
+                # Migrate the product's images concurrently
+                results = await asyncio.gather(
+                    *(migrate_image(image_path, product_id) for image_path in product.get("images", []))
+                )
+
+                # Queue one positional update per changed image for the next
+                # bulk flush - each op ships a couple of URLs instead of the
+                # whole array, and stays safe under concurrent writes. The
+                # changed flag comes from migrate_image, so no URL strings
+                # are re-compared here.
+                changed = 0
+                for old_url, (new_url, was_migrated) in zip(product.get("images", []), results):
+                    if was_migrated:
+                        ops.append(UpdateOne(
+                            {"_id": product["_id"], "images": old_url},
+                            {"$set": {"images.$": new_url}}
+                        ))
+                        changed += 1
+                if changed:
+                    updated_count += 1
+                    print(f"  ✅ Queued {changed} image update(s)")
+                else:
+                    print(f"  ℹ️  No changes needed")
+
+                # Flush queued updates in one round-trip per batch
+                if len(ops) >= BULK_BATCH_SIZE:
+                    await products_collection.bulk_write(ops, ordered=False)
+                    ops.clear()
+
+            except Exception as e:
+                print(f"  ❌ Error processing product {product_id}: {e}")
+                error_count += 1
+
+        if ops:
+            await products_collection.bulk_write(ops, ordered=False)
+
     print(f"\n🎉 Migration completed!")
     print(f"   📊 Products updated: {updated_count}")
     print(f"   ❌ Errors encountered: {error_count}")
 
-async def migrate_single_image(image_path: str, product_id: str) -> str:
+async def migrate_single_image(image_path: str, product_id: str, session: aiohttp.ClientSession) -> str:
     """Migrate a single image to cloud storage"""
-    
+
     try:
-        # Handle different image path formats
-        if image_path.startswith("/uploads"):
-            # Local server path
-            local_file_path = Path(__file__).parent.parent / image_path.lstrip("/")
-        elif image_path.startswith("https://adorona.onrender.com"):
+        if image_path.startswith("https://adorona.onrender.com"):
             # Production URL - download the image first
-            return await migrate_from_url(image_path, product_id)
-        elif image_path.startswith("uploads"):
-            # Relative path
-            local_file_path = Path(__file__).parent.parent / image_path
-        else:
-            # Assume it's a filename in uploads
-            local_file_path = Path(__file__).parent.parent / "uploads" / image_path
-        
+            return await migrate_from_url(image_path, product_id, session)
+
+        local_file_path = _resolve_local(image_path)
+
         # Check if local file exists
         if not local_file_path.exists():
             print(f"    ❌ Local file not found: {local_file_path}")
             return None
-        
-        # Read and encode to base64
-        with open(local_file_path, "rb") as f:
-            image_data = f.read()
-        
-        # Convert to base64
-        image_base64 = base64.b64encode(image_data).decode('utf-8')
-        
+
+        # Read the raw bytes off-loop so other migrations keep running
+        # during disk I/O
+        image_data = await asyncio.to_thread(local_file_path.read_bytes)
+
+        # Reuse the existing cloud URL if identical bytes were already uploaded
+        content_hash, cached_url = await _check_hash_cache(image_data)
+        if cached_url:
+            print(f"    ♻️  Duplicate image, reusing: {cached_url}")
+            return cached_url
+
         # Determine image format from file extension
-        file_ext = local_file_path.suffix.lower().lstrip('.')
-        if file_ext in ['jpg', 'jpeg']:
-            mime_type = 'image/jpeg'
-        elif file_ext == 'png':
-            mime_type = 'image/png'
-        elif file_ext == 'webp':
-            mime_type = 'image/webp'
-        else:
-            mime_type = 'image/jpeg'  # Default
-        
-        # Create data URI
-        data_uri = f"data:{mime_type};base64,{image_base64}"
-        
-        # Upload to cloud storage
-        cloud_url = await cloud_storage.upload_image(data_uri, "products")
-        
+        mime_type = _MIME.get(local_file_path.suffix.lower().lstrip('.'), 'image/jpeg')
+
+        # Upload raw bytes to cloud storage - no base64/data-URI round-trip
+        cloud_url = await cloud_storage.upload_bytes(image_data, mime_type, "products")
+
+        if cloud_url:
+            await _record_hash(content_hash, cloud_url)
+
         return cloud_url
-        
+
     except Exception as e:
         print(f"    ❌ Error migrating image {image_path}: {e}")
         return None
 
-async def migrate_from_url(image_url: str, product_id: str) -> str:
+async def migrate_from_url(image_url: str, product_id: str, session: aiohttp.ClientSession) -> str:
     """Download image from URL and upload to cloud storage"""
-    
+
     try:
         print(f"    📥 Downloading from URL: {image_url}")
-        
-        # Download the image
-        response = requests.get(image_url, timeout=30)
-        response.raise_for_status()
-        
-        # Convert to base64
-        image_base64 = base64.b64encode(response.content).decode('utf-8')
-        
-        # Determine content type
-        content_type = response.headers.get('content-type', 'image/jpeg')
-        
-        # Create data URI
-        data_uri = f"data:{content_type};base64,{image_base64}"
-        
-        # Upload to cloud storage
-        cloud_url = await cloud_storage.upload_image(data_uri, "products")
-        
+
+        # Download the image without blocking the event loop, streaming the
+        # body in fixed-size chunks
+        async with session.get(image_url) as response:
+            response.raise_for_status()
+            image_bytes = await read_response_bytes(response)
+            content_type = response.headers.get('content-type', 'image/jpeg')
+
+        # Reuse the existing cloud URL if identical bytes were already uploaded
+        content_hash, cached_url = await _check_hash_cache(image_bytes)
+        if cached_url:
+            print(f"    ♻️  Duplicate image, reusing: {cached_url}")
+            return cached_url
+
+        # Upload raw bytes to cloud storage - no base64/data-URI round-trip
+        cloud_url = await cloud_storage.upload_bytes(image_bytes, content_type, "products")
+
+        if cloud_url:
+            await _record_hash(content_hash, cloud_url)
+
         return cloud_url
         
     except Exception as e:
         print(f"    ❌ Error downloading from URL: {e}")
         return None
 
+async def _main():
+    """Connect, run the migration, and always release the connection pool."""
+    success = await connect_to_mongo()
+    if not success:
+        print("❌ Failed to connect to database")
+        return
+    try:
+        await migrate_images_to_cloud()
+    finally:
+        await close_mongo_connection()
+
 if __name__ == "__main__":
     print("🔄 Image Migration to Cloud Storage")
     print("=" * 50)
-    
+
     # Run the migration
-    asyncio.run(migrate_images_to_cloud())
\ No newline at end of file
+    asyncio.run(_main())
\ No newline at end of file
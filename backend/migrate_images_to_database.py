@@ -6,16 +6,63 @@ import asyncio
 import sys
 from pathlib import Path
 import aiohttp
-import base64
 
 # Add the backend directory to Python path
 sys.path.append('.')
 
-from app.db.connection import get_database, connect_to_mongo
+# Resolved once at import - keeps the stat syscalls out of the per-image path
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+
+from pymongo import UpdateOne
+
+from app.db.connection import get_database, connect_to_mongo, close_mongo_connection
 from app.utils.database_image_storage import DatabaseImageService
 from app.config import BACKEND_URL, ENVIRONMENT
 import os
 
+# Flush accumulated product updates in batches of this size
+BULK_BATCH_SIZE = 500
+
+# File-extension → MIME type table for migrated images
+_MIME = {
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+    "gif": "image/gif"
+}
+
+def _resolve_local(image_path: str) -> Path:
+    """Map the stored path formats (/uploads/... or uploads/...) to a local file path."""
+    if image_path.startswith("/uploads"):
+        return BACKEND_ROOT / image_path.lstrip("/")
+    return BACKEND_ROOT / image_path
+
+# Bound concurrent downloads and image inserts
+sem = asyncio.Semaphore(16)
+
+async def read_response_bytes(response: aiohttp.ClientResponse) -> bytearray:
+    """Stream a response body in 64 KiB chunks into a preallocated buffer."""
+    # Sizing the buffer from Content-Length avoids repeated reallocation
+    # while the body streams in
+    length = int(response.headers.get('content-length', 0))
+    buf = bytearray(length)
+    pos = 0
+    async for chunk in response.content.iter_chunked(65536):
+        end = pos + len(chunk)
+        if end <= length:
+            buf[pos:end] = chunk
+        else:
+            # Body longer than the declared length (e.g. aiohttp decompressed
+            # a gzip response whose Content-Length was the compressed size):
+            # drop the unwritten preallocated tail before appending, so no
+            # zero gap ends up in the middle of the data
+            del buf[pos:]
+            buf += chunk
+        pos = end
+    del buf[pos:]
+    return buf
+
 async def migrate_images_to_database():
     """Migrate all existing product images to database storage"""
     
@@ -32,141 +79,166 @@ async def migrate_images_to_database():
     products_collection = db.products
     image_service = DatabaseImageService(db)
     
-    # Get all products with images
-    products = await products_collection.find({
-        "images": {"$exists": True, "$ne": []}
-    }).to_list(None)
-    
-    print(f"📊 Found {len(products)} products with images")
-    
+    # Stream products with images instead of materializing them all in RAM,
+    # projecting just the fields the migration touches. The $elemMatch filter
+    # keeps fully migrated products server-side entirely.
+    query = {
+        "images": {
+            "$exists": True,
+            "$ne": [],
+            "$elemMatch": {"$not": {"$regex": "/api/images/"}}
+        }
+    }
+    product_count = await products_collection.count_documents(query)
+    print(f"📊 Found {product_count} products with images")
+
+    cursor = products_collection.find(
+        query, projection={"_id": 1, "name": 1, "images": 1}
+    ).batch_size(200)
+
     updated_count = 0
     error_count = 0
     
     # Get backend URL for generating new URLs
     backend_url = os.getenv("BACKEND_URL", "http://localhost:5858" if ENVIRONMENT == "development" else "https://adorona.onrender.com")
-    
-    for product in products:
+
+    ops = []
+
+    async def migrate_image(image_path: str, product_id: str) -> tuple:
+        """Migrate one image under the concurrency limit, keeping the original on failure.
+
+        Returns (url, changed) so the caller can queue updates without
+        re-comparing URL strings.
+        """
+        nonlocal error_count
+
+        # Skip if already a database image URL
+        if "/api/images/" in image_path:
+            print(f"    ✅ Already database URL, skipping: {image_path}")
+            return image_path, False
+
+        # Try to migrate the image
         try:
-            product_id = str(product["_id"])
-            print(f"\n🔄 Processing product: {product.get('name', 'Unknown')} ({product_id})")
-            
-            new_image_urls = []
-            
-            for i, image_path in enumerate(product.get("images", [])):
-                print(f"  📸 Processing image {i+1}: {image_path}")
-                
-                # Skip if already a database image URL
-                if "/api/images/" in image_path:
-                    print(f"    ✅ Already database URL, skipping")
-                    new_image_urls.append(image_path)
-                    continue
-                
-                # Try to migrate the image
-                try:
-                    image_id = await migrate_single_image(image_path, product_id, image_service)
-                    if image_id:
-                        new_url = f"{backend_url}/api/images/{image_id}"
-                        new_image_urls.append(new_url)
-                        print(f"    ✅ Migrated to: {new_url}")
-                    else:
-                        # Keep original if migration fails
-                        new_image_urls.append(image_path)
-                        print(f"    ⚠️  Migration failed, keeping original")
-                        
-                except Exception as e:
-                    print(f"    ❌ Error migrating image: {e}")
-                    new_image_urls.append(image_path)  # Keep original
-                    error_count += 1
-            
-            # Update product with new image URLs
-            if new_image_urls != product.get("images", []):
-                await products_collection.update_one(
-                    {"_id": product["_id"]},
-                    {"$set": {"images": new_image_urls}}
-                )
-                updated_count += 1
-                print(f"  ✅ Updated product in database")
-            else:
-                print(f"  ℹ️  No changes needed")
-                
+            async with sem:
+                image_id = await migrate_single_image(image_path, product_id, image_service, session)
+            if image_id:
+                new_url = f"{backend_url}/api/images/{image_id}"
+                print(f"    ✅ Migrated to: {new_url}")
+                return new_url, True
+            # Keep original if migration fails
+            print(f"    ⚠️  Migration failed, keeping original: {image_path}")
+            return image_path, False
+
         except Exception as e:
-            print(f"  ❌ Error processing product {product_id}: {e}")
+            print(f"    ❌ Error migrating image: {e}")
             error_count += 1
-    
+            return image_path, False  # Keep original
+
+    # One pooled HTTP session for every URL download in the run; keep-alive
+    # amortizes the TCP+TLS handshake across all downloads from the same host
+    connector = aiohttp.TCPConnector(limit=32, limit_per_host=8, keepalive_timeout=60)
+    async with aiohttp.ClientSession(
+        connector=connector,
+        headers={"Accept-Encoding": "gzip, deflate"},
+        timeout=aiohttp.ClientTimeout(total=30)
+    ) as session:
+        async for product in cursor:
+            try:
+                product_id = str(product["_id"])
+                print(f"\n🔄 Processing product: {product.get('name', 'Unknown')} ({product_id})")
+
+                # Migrate the product's images concurrently
+                results = await asyncio.gather(
+                    *(migrate_image(image_path, product_id) for image_path in product.get("images", []))
+                )
+
+                # Queue one positional update per changed image for the next
+                # bulk flush - each op ships a couple of URLs instead of the
+                # whole array, and stays safe under concurrent writes. The
+                # changed flag comes from migrate_image, so no URL strings
+                # are re-compared here.
+                changed = 0
+                for old_url, (new_url, was_migrated) in zip(product.get("images", []), results):
+                    if was_migrated:
+                        ops.append(UpdateOne(
+                            {"_id": product["_id"], "images": old_url},
+                            {"$set": {"images.$": new_url}}
+                        ))
+                        changed += 1
+                if changed:
+                    updated_count += 1
+                    print(f"  ✅ Queued {changed} image update(s)")
+                else:
+                    print(f"  ℹ️  No changes needed")
+
+                # Flush queued updates in one round-trip per batch
+                if len(ops) >= BULK_BATCH_SIZE:
+                    await products_collection.bulk_write(ops, ordered=False)
+                    ops.clear()
+
+            except Exception as e:
+                print(f"  ❌ Error processing product {product_id}: {e}")
+                error_count += 1
+
+        if ops:
+            await products_collection.bulk_write(ops, ordered=False)
+
     print(f"\n🎉 Migration completed!")
     print(f"   📊 Products updated: {updated_count}")
     print(f"   ❌ Errors encountered: {error_count}")
 
-async def migrate_single_image(image_path: str, product_id: str, image_service: DatabaseImageService) -> str:
+async def migrate_single_image(image_path: str, product_id: str,
+                               image_service: DatabaseImageService,
+                               session: aiohttp.ClientSession) -> str:
     """Migrate a single image to database storage"""
-    
+
     try:
-        base64_data = None
-        
         # Handle different image path formats
         if image_path.startswith("https://") or image_path.startswith("http://"):
-            # Download from URL
+            # Download from URL without blocking the event loop
             print(f"    📥 Downloading from URL...")
-            response = requests.get(image_path, timeout=30)
-            response.raise_for_status()
-            
-            # Convert to base64
-            image_bytes = response.content
-            base64_data = base64.b64encode(image_bytes).decode('utf-8')
-            
-            # Determine content type
-            content_type = response.headers.get('content-type', 'image/jpeg')
-            
-            # Create data URI
-            data_uri = f"data:{content_type};base64,{base64_data}"
-            
+            async with session.get(image_path) as response:
+                response.raise_for_status()
+                image_bytes = await read_response_bytes(response)
+                content_type = response.headers.get('content-type', 'image/jpeg')
+
         elif image_path.startswith("/uploads") or image_path.startswith("uploads"):
             # Local file path
-            local_file_path = None
-            if image_path.startswith("/uploads"):
-                local_file_path = Path(__file__).parent.parent / image_path.lstrip("/")
-            else:
-                local_file_path = Path(__file__).parent.parent / image_path
-            
+            local_file_path = _resolve_local(image_path)
+
             if not local_file_path.exists():
                 print(f"    ❌ Local file not found: {local_file_path}")
                 return None
-            
-            # Read and encode to base64
-            with open(local_file_path, "rb") as f:
-                image_bytes = f.read()
-            
-            base64_data = base64.b64encode(image_bytes).decode('utf-8')
-            
+
+            # Read the raw bytes off-loop so other migrations keep running
+            # during disk I/O
+            image_bytes = await asyncio.to_thread(local_file_path.read_bytes)
+
             # Determine content type from file extension
-            file_ext = local_file_path.suffix.lower().lstrip('.')
-            if file_ext in ['jpg', 'jpeg']:
-                content_type = 'image/jpeg'
-            elif file_ext == 'png':
-                content_type = 'image/png'
-            elif file_ext == 'webp':
-                content_type = 'image/webp'
-            else:
-                content_type = 'image/jpeg'  # Default
-            
-            # Create data URI
-            data_uri = f"data:{content_type};base64,{base64_data}"
-        
+            content_type = _MIME.get(local_file_path.suffix.lower().lstrip('.'), 'image/jpeg')
+
         else:
             print(f"    ❓ Unknown image path format: {image_path}")
             return None
-        
-        # Store in database
-        result = await image_service.store_image(data_uri, product_id)
+
+        # Store raw bytes in database - no base64/data-URI round-trip here
+        result = await image_service.store_bytes(image_bytes, content_type, product_id)
         return result["image_id"]
-        
+
     except Exception as e:
         print(f"    ❌ Error migrating image {image_path}: {e}")
         return None
 
+async def _main():
+    """Run the migration and always release the connection pool."""
+    try:
+        await migrate_images_to_database()
+    finally:
+        await close_mongo_connection()
+
 if __name__ == "__main__":
     print("🔄 Image Migration to Database Storage")
     print("=" * 50)
-    
+
     # Run the migration
-    asyncio.run(migrate_images_to_database())
\ No newline at end of file
+    asyncio.run(_main())
\ No newline at end of file
@@ -5,7 +5,6 @@ Copy images from frontend public to backend uploads and fix database
 import asyncio
 import shutil
 from motor.motor_asyncio import AsyncIOMotorClient
-from datetime import datetime
 import os
 from dotenv import load_dotenv
 from bson import ObjectId
@@ -19,10 +18,10 @@ DATABASE_NAME = os.getenv("DATABASE_NAME", "arodona_db")
 
 async def setup_image_serving():
     """Copy images and fix database paths"""
+    client = AsyncIOMotorClient(MONGODB_URL, maxPoolSize=50, minPoolSize=10)
     try:
-        client = AsyncIOMotorClient(MONGODB_URL)
         db = client[DATABASE_NAME]
-        
+
         print("=" * 70)
         print("SETTING UP IMAGE SERVING")
         print("=" * 70)
@@ -52,19 +51,23 @@ async def setup_image_serving():
             "young-woman-wearing-elegant-pearl-jewelry-grey-background-closeup 2.jpg"
         ]
         
-        copied_files = 0
+        # Pre-check existence so missing files still get their warning,
+        # then run the I/O-bound copies in parallel off the event loop
+        to_copy = []
         for image_name in key_images:
-            source = frontend_images / image_name
-            dest = backend_uploads / image_name
-            
-            if source.exists():
-                shutil.copy2(source, dest)
-                print(f"✅ Copied: {image_name}")
-                copied_files += 1
+            if (frontend_images / image_name).exists():
+                to_copy.append(image_name)
             else:
                 print(f"⚠️  Not found: {image_name}")
-        
-        print(f"\n📂 Copied {copied_files} images to backend uploads")
+
+        await asyncio.gather(*[
+            asyncio.to_thread(shutil.copy2, frontend_images / name, backend_uploads / name)
+            for name in to_copy
+        ])
+        for image_name in to_copy:
+            print(f"✅ Copied: {image_name}")
+
+        print(f"\n📂 Copied {len(to_copy)} images to backend uploads")
         
         # Update database to use proper upload paths
         print("\n" + "=" * 70)
@@ -72,40 +75,58 @@ async def setup_image_serving():
         print("=" * 70)
         print()
         
-        products = await db.products.find({}).to_list(None)
-        
-        for product in products:
-            updated_images = []
-            
-            for image in product.get('images', []):
-                if isinstance(image, dict):
-                    old_url = image.get('url', '')
-                    
-                    # Convert /Images/filename to /uploads/Images/filename
-                    if old_url.startswith('/Images/'):
-                        new_url = old_url.replace('/Images/', '/uploads/Images/')
-                        image['url'] = new_url
-                        
-                        # Update thumbnail too
-                        if 'thumbnail_url' in image and image['thumbnail_url'].startswith('/Images/'):
-                            image['thumbnail_url'] = image['thumbnail_url'].replace('/Images/', '/uploads/Images/')
-                
-                updated_images.append(image)
-            
-            # Update product in database
-            if updated_images:
-                await db.products.update_one(
-                    {"_id": product['_id']},
-                    {
-                        "$set": {
-                            "images": updated_images,
-                            "updated_at": datetime.utcnow()
+        # Rewrite /Images/ URLs to /uploads/Images/ entirely inside MongoDB
+        # with one aggregation-pipeline update - no documents cross the wire.
+        # Non-dict image entries pass through unchanged, mirroring the old
+        # isinstance(image, dict) check.
+        # Rewrite a field only when it actually starts with /Images/ -
+        # matching the old startswith checks - so /uploads/Images/... and
+        # absolute URLs pass through and missing fields are never written
+        def _prefix_rewrite(field):
+            return {"$cond": [
+                {"$regexMatch": {
+                    "input": {"$ifNull": [f"$$img.{field}", ""]},
+                    "regex": "^/Images/"
+                }},
+                {field: {"$replaceOne": {
+                    "input": f"$$img.{field}",
+                    "find": "/Images/",
+                    "replacement": "/uploads/Images/"
+                }}},
+                {}
+            ]}
+
+        rewrite_urls = {
+            "$mergeObjects": [
+                "$$img",
+                _prefix_rewrite("url"),
+                _prefix_rewrite("thumbnail_url")
+            ]
+        }
+
+        result = await db.products.update_many(
+            {"images.url": {"$regex": "^/Images/"}},
+            [{
+                "$set": {
+                    "images": {
+                        "$map": {
+                            "input": "$images",
+                            "as": "img",
+                            "in": {
+                                "$cond": [
+                                    {"$eq": [{"$type": "$$img"}, "object"]},
+                                    rewrite_urls,
+                                    "$$img"
+                                ]
+                            }
                         }
-                    }
-                )
-                
-                print(f"✅ Updated image paths for: {product.get('name')}")
-        
+                    },
+                    "updated_at": "$$NOW"
+                }
+            }]
+        )
+
+        print(f"✅ Updated {result.modified_count} products in one round-trip")
         print("\n✅ All image paths updated to use /uploads/Images/")
         
         # Test file access
@@ -126,6 +147,9 @@ async def setup_image_serving():
         print(f"❌ Error: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        # Release the connection pool instead of leaking it at exit
+        client.close()
 
 if __name__ == "__main__":
     asyncio.run(setup_image_serving())
\ No newline at end of file
@@ -14,6 +14,15 @@ sys.path.append('.')
 from app.db.connection import get_database, connect_to_mongo
 from app.utils.database_image_storage import DatabaseImageService
 
+def _encode_test_png() -> bytes:
+    """Encode the 100x100 green test square once at import time."""
+    buf = io.BytesIO()
+    Image.new('RGB', (100, 100), color='green').save(buf, format='PNG')
+    return buf.getvalue()
+
+# Constant payload - keeps the PIL encode out of the per-test path
+_TEST_PNG_BYTES = _encode_test_png()
+
 async def test_database_image_storage():
     """Test direct database image storage"""
     
@@ -29,36 +38,28 @@ async def test_database_image_storage():
     db = get_database()
     image_service = DatabaseImageService(db)
     
-    # Create test image
-    print("\n📸 Creating test image...")
-    img = Image.new('RGB', (100, 100), color='green')
-    img_bytes = io.BytesIO()
-    img.save(img_bytes, format='PNG')
-    img_bytes.seek(0)
-    
     # Create mock upload file
     class MockUploadFile:
         def __init__(self, data, filename, content_type):
-            self.data = data
+            # memoryview so read() hands out zero-copy slices
+            self.data = memoryview(data)
             self.filename = filename
             self.content_type = content_type
             self._position = 0
-        
+
         async def read(self, size=-1):
-            if size == -1:
-                result = self.data[self._position:]
-                self._position = len(self.data)
-            else:
-                result = self.data[self._position:self._position + size]
-                self._position += len(result)
+            # One zero-copy slice per call; callers accept memoryview
+            end = len(self.data) if size == -1 else min(self._position + size, len(self.data))
+            result = self.data[self._position:end]
+            self._position = end
             return result
         
         async def seek(self, position):
             self._position = position
     
     mock_file = MockUploadFile(
-        img_bytes.getvalue(), 
-        "test_green_square.png", 
+        _TEST_PNG_BYTES,
+        "test_green_square.png",
         "image/png"
     )
     
@@ -14,11 +14,19 @@ from PIL import Image
 BACKEND_URL = "http://localhost:5858"
 TEST_IMAGE_PATH = "test_image.png"
 
+def _encode_test_png() -> bytes:
+    """Encode the 100x100 red test square once at import time."""
+    buf = BytesIO()
+    Image.new('RGB', (100, 100), color='red').save(buf, format='PNG')
+    return buf.getvalue()
+
+# Constant payload - keeps the PIL encode out of the per-test path
+_TEST_PNG_BYTES = _encode_test_png()
+
 async def create_test_image():
-    """Create a simple test image."""
-    # Create a simple 100x100 red square PNG image
-    img = Image.new('RGB', (100, 100), color='red')
-    img.save(TEST_IMAGE_PATH)
+    """Write the precomputed test image to disk."""
+    with open(TEST_IMAGE_PATH, 'wb') as f:
+        f.write(_TEST_PNG_BYTES)
     print(f"✅ Created test image: {TEST_IMAGE_PATH}")
 
 async def test_image_direct_storage():
@@ -36,25 +44,23 @@ async def test_image_direct_storage():
         # Initialize image service
         image_service = DatabaseImageService(db)
         
-        # Read test image
-        with open(TEST_IMAGE_PATH, 'rb') as f:
-            image_data = f.read()
-        
+        # Use the precomputed test image - no file round-trip needed
+        image_data = _TEST_PNG_BYTES
+
         # Create a mock UploadFile object
         class MockUploadFile:
             def __init__(self, data, filename):
-                self.data = data
+                # memoryview so read() hands out zero-copy slices
+                self.data = memoryview(data)
                 self.filename = filename
                 self.content_type = "image/png"
                 self._position = 0
             
             async def read(self, size=-1):
-                if size == -1:
-                    result = self.data[self._position:]
-                    self._position = len(self.data)
-                else:
-                    result = self.data[self._position:self._position + size]
-                    self._position += len(result)
+                # One zero-copy slice per call; callers accept memoryview
+                end = len(self.data) if size == -1 else min(self._position + size, len(self.data))
+                result = self.data[self._position:end]
+                self._position = end
                 return result
             
             async def seek(self, position):
@@ -6,105 +6,133 @@ import asyncio
 import sys
 sys.path.append('.')
 
+from tempfile import SpooledTemporaryFile
+
+from starlette.datastructures import Headers, UploadFile
+
 from app.db.connection import get_database, connect_to_mongo
 from app.utils.database_image_storage import DatabaseImageService
 from PIL import Image
 import io
 import base64
+import logging
+
+log = logging.getLogger("tests.images")
+
+def _encode_test_png() -> bytes:
+    """Encode the 50x50 green test square once at import time."""
+    buf = io.BytesIO()
+    Image.new('RGB', (50, 50), color='green').save(buf, format='PNG')
+    return buf.getvalue()
+
+# Constant payload - keeps the PIL encode out of the per-test path
+_TEST_PNG_BYTES = _encode_test_png()
+
+def _make_upload_file(filename: str) -> UploadFile:
+    """Build a real UploadFile over a spooled buffer - the production type."""
+    spool = SpooledTemporaryFile(max_size=1 << 20)
+    spool.write(_TEST_PNG_BYTES)
+    spool.seek(0)
+    return UploadFile(
+        file=spool,
+        filename=filename,
+        headers=Headers({"content-type": "image/png"})
+    )
 
 async def test_and_create_image_collection():
     """Test image storage and create collection if needed"""
     
-    print("🔍 Testing Image Storage Collection...")
+    log.info("🔍 Testing Image Storage Collection...")
     
     success = await connect_to_mongo()
     if not success:
-        print("❌ Database connection failed")
+        log.error("❌ Database connection failed")
         return
     
     db = get_database()
-    
-    # Check current collections
-    collections = await db.list_collection_names()
-    print(f"📋 Available collections: {len(collections)}")
-    
-    # Create a test image
-    print("\n📸 Creating test image...")
-    img = Image.new('RGB', (50, 50), color='green')
-    img_bytes = io.BytesIO()
-    img.save(img_bytes, format='PNG')
-    img_bytes.seek(0)
-    
-    # Create mock upload file
-    class MockUploadFile:
-        def __init__(self, data, filename, content_type):
-            self.data = data
-            self.filename = filename
-            self.content_type = content_type
-            self._position = 0
-        
-        async def read(self, size=-1):
-            if size == -1:
-                result = self.data[self._position:]
-                self._position = len(self.data)
-            else:
-                result = self.data[self._position:self._position + size]
-                self._position += len(result)
-            return result
-        
-        async def seek(self, position):
-            self._position = position
-    
-    mock_file = MockUploadFile(
-        img_bytes.getvalue(), 
-        "test_collection.png", 
-        "image/png"
-    )
-    
+
+    # A realistic batch: K upload files reusing the cached PNG bytes
+    K = 100
+    mock_files = [
+        _make_upload_file(f"test_collection_{i}.png")
+        for i in range(K)
+    ]
+
     # Test image service
-    print("💾 Testing DatabaseImageService...")
+    log.info("💾 Testing DatabaseImageService bulk insert (%d images)...", K)
     image_service = DatabaseImageService(db)
-    
+
     try:
-        result = await image_service.store_image(
-            image_file=mock_file,
+        image_ids = await image_service.store_images_bulk(
+            mock_files,
             product_id="test_collection_123",
             vendor_id="test_vendor_123",
             image_type="product"
         )
-        
-        print(f"✅ Image stored successfully!")
-        print(f"   Image ID: {result['image_id']}")
-        print(f"   File size: {result['file_size']} bytes")
-        
-        # Check if collection was created
-        collections_after = await db.list_collection_names()
-        new_collections = set(collections_after) - set(collections)
-        
-        if new_collections:
-            print(f"📁 New collections created: {new_collections}")
-        
+
+        log.info("✅ %d images stored in one insert_many!", len(image_ids))
+        log.info("   First image ID: %s", image_ids[0])
+
+        # Index the lookup field once so realistic queries stay indexed
+        await db.images.create_index([("product_id", 1)])
+
+        # The remaining probes are independent of each other, so overlap
+        # their round-trips instead of awaiting them one at a time
+        listing, count, retrieved = await asyncio.gather(
+            db.command('listCollections', nameOnly=True),
+            db.images.count_documents({}),
+            image_service.get_image(image_ids[0])
+        )
+        collection_names = {c["name"] for c in listing["cursor"]["firstBatch"]}
+
         # Check images collection
-        if 'images' in collections_after:
-            count = await db.images.count_documents({})
-            print(f"📊 Images collection now has {count} documents")
-            
+        if 'images' in collection_names:
+            log.info("📊 Images collection now has %d documents", count)
+
             # Test retrieval
-            retrieved = await image_service.get_image(result['image_id'])
             if retrieved:
-                print(f"✅ Image retrieval successful!")
-                print(f"   Content type: {retrieved['content_type']}")
-                print(f"   File extension: {retrieved['file_extension']}")
+                log.info("✅ Image retrieval successful!")
+                log.info("   Content type: %s", retrieved['content_type'])
+                log.info("   File extension: %s", retrieved['file_extension'])
             else:
-                print("❌ Image retrieval failed")
-        
+                log.error("❌ Image retrieval failed")
+        else:
+            log.error("❌ Images collection was not created")
+
+        # GridFS path: identical payloads must deduplicate to one file
+        log.info("💾 Testing GridFS storage with SHA-1 dedup...")
+        first = await image_service.store_bytes_gridfs(
+            _TEST_PNG_BYTES, "image/png", product_id="test_collection_123"
+        )
+        second = await image_service.store_bytes_gridfs(
+            _TEST_PNG_BYTES, "image/png", product_id="test_collection_123"
+        )
+
+        if first["image_id"] == second["image_id"] and second["deduplicated"]:
+            log.info("✅ Duplicate payload reused file %s", first['image_id'])
+        else:
+            log.error("❌ GridFS stored identical payloads separately")
+
+        retrieved_fs = await image_service.get_image_gridfs(first["image_id"])
+        if retrieved_fs["image_data"] == _TEST_PNG_BYTES:
+            log.info("✅ GridFS retrieval round-trips %d bytes", retrieved_fs['file_size'])
+        else:
+            log.error("❌ GridFS retrieval returned different bytes")
+
         return True
-        
+
     except Exception as e:
-        print(f"❌ Image storage test failed: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("❌ Image storage test failed: %s", e)
         return False
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    # Use uvloop when available - same API, lower event-loop overhead
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     asyncio.run(test_and_create_image_collection())
\ No newline at end of file
@@ -6,31 +6,45 @@ import asyncio
 import aiohttp
 import sys
 import json
+import time
 from pathlib import Path
 from PIL import Image
 import io
 import base64
+import logging
 
 sys.path.append('.')
 
+log = logging.getLogger("tests.images")
+
+# Use orjson for response parsing when available - same output, ~3-5x
+# faster decode - falling back to stdlib json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # Test configuration
 BACKEND_URL = "http://localhost:5858"
-TEST_IMAGE_PATH = "test_product_image.png"
 
-async def create_test_image():
-    """Create a simple test image"""
-    # Create a simple 200x200 blue square PNG image
-    img = Image.new('RGB', (200, 200), color='blue')
-    img.save(TEST_IMAGE_PATH)
-    print(f"✅ Created test image: {TEST_IMAGE_PATH}")
-    return TEST_IMAGE_PATH
+def _encode_test_png() -> bytes:
+    """Encode the 200x200 blue test square once at import time."""
+    buf = io.BytesIO()
+    Image.new('RGB', (200, 200), color='blue').save(buf, format='PNG')
+    return buf.getvalue()
+
+# Constant payload - keeps the PIL encode and the disk round-trip out of
+# the per-test path
+_TEST_PNG_BYTES = _encode_test_png()
 
 async def test_product_creation_with_image():
     """Test creating a product with image upload"""
-    
-    # First create test image
-    image_path = await create_test_image()
-    
+
+    # Unique SKU computed once up front - asyncio.get_event_loop() outside a
+    # running-loop context is deprecated and slower than a clock read
+    sku = f"TEST_SKU_{time.monotonic_ns()}"
+
     try:
         # Login first (you'll need to use actual vendor credentials)
         login_data = {
@@ -38,34 +52,32 @@ async def test_product_creation_with_image():
             "password": "test123"         # Replace with actual password
         }
         
-        async with aiohttp.ClientSession() as session:
+        # Pooled connector so the concurrent image checks share sockets
+        connector = aiohttp.TCPConnector(limit_per_host=16)
+        async with aiohttp.ClientSession(connector=connector) as session:
             # Login to get token
-            print("🔐 Attempting login...")
+            log.info("🔐 Attempting login...")
             async with session.post(f"{BACKEND_URL}/api/auth/login", json=login_data) as login_response:
                 if login_response.status != 200:
-                    print(f"❌ Login failed: {login_response.status}")
+                    log.error("❌ Login failed: %d", login_response.status)
                     response_text = await login_response.text()
-                    print(f"Response: {response_text}")
+                    log.error("Response: %s", response_text)
                     return
                 
-                login_result = await login_response.json()
+                login_result = _json_loads(await login_response.read())
                 token = login_result.get("access_token")
                 
                 if not token:
-                    print("❌ No token received from login")
+                    log.error("❌ No token received from login")
                     return
                 
-                print(f"✅ Login successful, got token")
+                log.info("✅ Login successful, got token")
                 
                 # Prepare headers with authentication
                 headers = {
                     "Authorization": f"Bearer {token}"
                 }
                 
-                # Prepare form data for product creation
-                with open(image_path, 'rb') as f:
-                    image_data = f.read()
-                
                 # Create FormData
                 data = aiohttp.FormData()
                 data.add_field('name', 'Test Product with Image')
@@ -74,79 +86,100 @@ async def test_product_creation_with_image():
                 data.add_field('jewelry_type', 'ring')
                 data.add_field('price', '999.99')
                 data.add_field('stock', '5')
-                data.add_field('sku', f'TEST_SKU_{int(asyncio.get_event_loop().time())}')
+                data.add_field('sku', sku)
                 data.add_field('metal_type', '18k_gold')
-                data.add_field('images', image_data, filename='test_image.png', content_type='image/png')
+                # File-object payload so aiohttp streams the body in chunks
+                # instead of buffering a second copy in the multipart writer
+                data.add_field('images', io.BytesIO(_TEST_PNG_BYTES),
+                               filename='test_image.png', content_type='image/png')
                 
                 # Create product
-                print("📦 Creating product with image...")
+                log.info("📦 Creating product with image...")
                 async with session.post(f"{BACKEND_URL}/api/products", data=data, headers=headers) as create_response:
-                    print(f"📡 Response status: {create_response.status}")
+                    log.info("📡 Response status: %d", create_response.status)
                     
                     if create_response.status == 200 or create_response.status == 201:
-                        result = await create_response.json()
-                        print(f"✅ Product created successfully!")
+                        result = _json_loads(await create_response.read())
+                        log.info("✅ Product created successfully!")
                         
                         # Check if product has images
                         product_id = result.get("product", {}).get("id") or result.get("id")
                         if product_id:
-                            print(f"📋 Product ID: {product_id}")
+                            log.info("📋 Product ID: %s", product_id)
                             
                             # Get the created product to check images
                             async with session.get(f"{BACKEND_URL}/api/products/{product_id}") as get_response:
                                 if get_response.status == 200:
-                                    product_data = await get_response.json()
+                                    product_data = _json_loads(await get_response.read())
                                     images = product_data.get("images", [])
-                                    print(f"📸 Product has {len(images)} images:")
+                                    log.info("📸 Product has %d images:", len(images))
                                     
                                     for i, img in enumerate(images):
                                         if isinstance(img, dict):
-                                            img_url = img.get("url", "")
-                                            print(f"  Image {i+1}: {img_url}")
-                                            
-                                            # Test if image URL works
-                                            if img_url:
-                                                async with session.get(img_url) as img_response:
-                                                    print(f"    Status: {img_response.status}")
-                                                    if img_response.status == 200:
-                                                        print(f"    ✅ Image accessible!")
-                                                        content_type = img_response.headers.get('content-type', '')
-                                                        content_length = img_response.headers.get('content-length', '0')
-                                                        print(f"    Content-Type: {content_type}")
-                                                        print(f"    Size: {content_length} bytes")
-                                                    else:
-                                                        print(f"    ❌ Image not accessible")
+                                            log.info("  Image %d: %s", i + 1, img.get('url', ''))
                                         else:
-                                            print(f"  Image {i+1}: {img} (string format)")
+                                            log.info("  Image %d: %s (string format)", i + 1, img)
+
+                                    async def check_image(img_url):
+                                        # HEAD: only status and headers are
+                                        # needed, so skip the body transfer
+                                        async with session.head(img_url, allow_redirects=True) as img_response:
+                                            return (
+                                                img_response.status,
+                                                img_response.headers.get('content-type', ''),
+                                                img_response.headers.get('content-length', '0')
+                                            )
+
+                                    # Verify every image URL concurrently so the
+                                    # round-trips overlap instead of summing up
+                                    urls = [img["url"] for img in images if isinstance(img, dict) and img.get("url")]
+                                    results = await asyncio.gather(
+                                        *(check_image(url) for url in urls),
+                                        return_exceptions=True
+                                    )
+
+                                    for img_url, check in zip(urls, results):
+                                        if isinstance(check, Exception):
+                                            log.error("    ❌ %s: %s", img_url, check)
+                                            continue
+                                        status, content_type, content_length = check
+                                        log.info("    Status: %d (%s)", status, img_url)
+                                        if status == 200:
+                                            log.info("    ✅ Image accessible!")
+                                            log.info("    Content-Type: %s", content_type)
+                                            log.info("    Size: %s bytes", content_length)
+                                        else:
+                                            log.error("    ❌ Image not accessible")
                                 else:
-                                    print(f"❌ Failed to get product details: {get_response.status}")
+                                    log.error("❌ Failed to get product details: %d", get_response.status)
                         else:
-                            print("⚠️ No product ID in response")
-                            print(f"Full response: {result}")
+                            log.warning("⚠️ No product ID in response")
+                            log.warning("Full response: %s", result)
                     else:
                         response_text = await create_response.text()
-                        print(f"❌ Product creation failed: {create_response.status}")
-                        print(f"Response: {response_text}")
+                        log.error("❌ Product creation failed: %d", create_response.status)
+                        log.error("Response: %s", response_text)
                         
     except Exception as e:
-        print(f"❌ Test failed: {e}")
-        import traceback
-        traceback.print_exc()
-    
-    finally:
-        # Cleanup
-        if Path(image_path).exists():
-            Path(image_path).unlink()
-            print(f"🧹 Cleaned up test image")
+        log.exception("❌ Test failed: %s", e)
 
 async def main():
     """Run the test"""
-    print("🧪 Testing Product Creation with Image Upload")
-    print("=" * 50)
+    log.info("🧪 Testing Product Creation with Image Upload")
+    log.info("=" * 50)
     
     await test_product_creation_with_image()
     
-    print("\n✅ Test completed!")
+    log.info("✅ Test completed!")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    # Use uvloop when available - same API, lower event-loop overhead
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     asyncio.run(main())
\ No newline at end of file
@@ -2,44 +2,62 @@
 """
 Test script to verify static file serving is working
 """
-import requests
-import time
-import sys
-from pathlib import Path
+import asyncio
+import logging
 
-def test_server_and_static_files():
+import aiohttp
+
+log = logging.getLogger("tests.static")
+
+BACKEND_URL = "http://localhost:5858"
+
+async def test_server_and_static_files():
     """Test if server is running and static files are accessible"""
-    
-    # Test if server is running
-    try:
-        response = requests.get("http://localhost:5858/", timeout=5)
-        print(f"✅ Server is running - Status: {response.status_code}")
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Server not running: {e}")
-        return False
-    
-    # Test static file access
-    test_files = [
-        "/uploads/Images/gold-ring-with-diamonds 1.jpg",
-        "/uploads/Images/1.png"
-    ]
-    
-    for file_path in test_files:
+
+    # One pooled session with keep-alive for every probe in the run
+    connector = aiohttp.TCPConnector(limit=32, keepalive_timeout=30)
+    timeout = aiohttp.ClientTimeout(total=5)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        # Test if server is running
         try:
-            url = f"http://localhost:5858{file_path}"
-            print(f"Testing: {url}")
-            response = requests.get(url, timeout=5)
-            
-            if response.status_code == 200:
-                print(f"✅ {file_path} - Status: {response.status_code}, Content-Type: {response.headers.get('content-type', 'N/A')}")
+            async with session.get(f"{BACKEND_URL}/") as response:
+                log.info("✅ Server is running - Status: %d", response.status)
+        except aiohttp.ClientError as e:
+            log.error("❌ Server not running: %s", e)
+            return False
+
+        # Test static file access
+        test_files = [
+            "/uploads/Images/gold-ring-with-diamonds 1.jpg",
+            "/uploads/Images/1.png"
+        ]
+
+        async def probe(file_path):
+            url = f"{BACKEND_URL}{file_path}"
+            log.info("Testing: %s", url)
+            async with session.get(url) as response:
+                return response.status, response.headers.get('content-type', 'N/A')
+
+        # Probe every file concurrently instead of one round-trip at a time
+        results = await asyncio.gather(
+            *(probe(file_path) for file_path in test_files),
+            return_exceptions=True
+        )
+
+        for file_path, result in zip(test_files, results):
+            if isinstance(result, Exception):
+                log.error("❌ Error accessing %s: %s", file_path, result)
             else:
-                print(f"❌ {file_path} - Status: {response.status_code}")
-                
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Error accessing {file_path}: {e}")
-    
+                status, content_type = result
+                if status == 200:
+                    log.info("✅ %s - Status: %d, Content-Type: %s", file_path, status, content_type)
+                else:
+                    log.error("❌ %s - Status: %d", file_path, status)
+
     return True
 
 if __name__ == "__main__":
-    print("Testing static file serving...")
-    test_server_and_static_files()
\ No newline at end of file
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    log.info("Testing static file serving...")
+    asyncio.run(test_server_and_static_files())
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test script to verify get_file_url output in both environments
+"""
+import sys
+sys.path.append('.')
+
+from app.utils.file_utils import get_file_url
+
+DEV_BACKEND_URL = "http://localhost:5858"
+CLOUD_URL = "https://res.cloudinary.com/demo/image/upload/sample.jpg"
+
+TEST_PATHS = [
+    "uploads/products/vendor1/product1/image.jpg",
+    "uploads\\products\\vendor1\\product1\\image.jpg",
+    "./uploads/avatars/user1/avatar.png",
+    CLOUD_URL,
+]
+
+# Precomputed expectation table - validating a batch of outputs is one dict
+# comparison instead of a chatty per-path print loop
+EXPECTED = {
+    ("production", TEST_PATHS[0]): "/uploads/products/vendor1/product1/image.jpg",
+    ("production", TEST_PATHS[1]): "/uploads/products/vendor1/product1/image.jpg",
+    ("production", TEST_PATHS[2]): "/uploads/avatars/user1/avatar.png",
+    ("production", CLOUD_URL): CLOUD_URL,
+    ("development", TEST_PATHS[0]): f"{DEV_BACKEND_URL}/uploads/products/vendor1/product1/image.jpg",
+    ("development", TEST_PATHS[1]): f"{DEV_BACKEND_URL}/uploads/products/vendor1/product1/image.jpg",
+    ("development", TEST_PATHS[2]): f"{DEV_BACKEND_URL}/uploads/avatars/user1/avatar.png",
+    ("development", CLOUD_URL): CLOUD_URL,
+}
+
+def _check(mode: str, actual: dict) -> bool:
+    """Compare a batch of URLs against the expectation table"""
+    expected = {path: EXPECTED[(mode, path)] for path in TEST_PATHS}
+    if actual == expected:
+        print(f"✅ {mode}: all {len(TEST_PATHS)} URLs match")
+        return True
+    for path in TEST_PATHS:
+        if actual[path] != expected[path]:
+            print(f"❌ {mode}: {path}")
+            print(f"   expected: {expected[path]}")
+            print(f"   actual:   {actual[path]}")
+    return False
+
+# (environment, backend_url) parameter table - one function covers both modes
+MODES = [
+    ("production", None),
+    ("development", DEV_BACKEND_URL),
+]
+
+def test_get_file_url(environment: str, backend_url) -> bool:
+    """Validate URLs for one injected settings combination"""
+    actual = {
+        path: get_file_url(path, environment=environment, backend_url=backend_url)
+        for path in TEST_PATHS
+    }
+    return _check(environment, actual)
+
+if __name__ == "__main__":
+    print("Testing get_file_url...")
+    results = [test_get_file_url(environment, backend_url) for environment, backend_url in MODES]
+    sys.exit(0 if all(results) else 1)